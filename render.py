@@ -0,0 +1,331 @@
+# Offline chart-to-video renderer
+#
+# Renders the playback view of main.py for a chart without a window or audio,
+# splitting the song timeline across a pool of worker processes.
+#
+#   python render.py --out frames                 # PNG sequence: frames/frame_000000.png ...
+#   python render.py --format raw --out clip.rgb  # raw RGB24 frames in a single file
+#   python render.py --format raw --out -         # raw RGB24 frames streamed to stdout
+#
+# Drawing a frame is cheap; PNG encoding is the bottleneck (roughly 15-25 ms a
+# frame, so only about real time per core), which raw output avoids entirely.
+#
+# Raw frames can be encoded without an intermediate file with e.g.:
+#   python render.py --format raw --out - | ffmpeg -f rawvideo -pix_fmt rgb24 -s 1000x600 -r 60 -i - -i assets/beat.wav clip.mp4
+
+import os
+
+# Must be set before pygame is initialised, in the parent and in every worker
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+# Leave SIGTERM alone so Pool.terminate() can still stop the workers
+os.environ.setdefault("SDL_NO_SIGNAL_HANDLERS", "1")
+
+import argparse
+import collections
+import contextlib
+import glob
+import json
+import multiprocessing
+import sys
+import time
+import wave
+
+import pygame
+
+# Optional: Pillow encodes PNGs faster than pygame.image.save when asked for
+# light compression
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# --- SETTINGS (same as main.py) ---
+SCREEN_WIDTH, SCREEN_HEIGHT = 1000, 600
+FPS = 60
+PIXELS_PER_SECOND = 100
+NOTE_SPEED = PIXELS_PER_SECOND
+LANE_Y = [200, 350]
+LANE_HEIGHT = 60
+KEY_NAMES = ["Z/L", "A/N"]
+FEEDBACK_SECONDS = 0.8
+COMBO_TYPES = ['ZL', 'AN']
+
+# --- COLORS ---
+BACKGROUND_COLOR = (20, 20, 30)
+LANE_COLOR = (50, 50, 50)
+HIT_LINE_COLOR = (255, 255, 255)
+NOTE_COLORS = {
+    'Z': (100, 200, 100),
+    'L': (50, 150, 50),
+    'ZL': (0, 255, 0),
+    'A': (255, 105, 180),
+    'N': (200, 50, 130),
+    'AN': (255, 20, 147),
+}
+TEXT_COLOR = (200, 200, 200)
+
+# Frames handed to a worker at a time; small enough to keep every core busy
+# until the end of the song, large enough to amortise the pickling overhead
+CHUNK_FRAMES = 120
+# When streaming to stdout every chunk is held in memory until it is written,
+# so use smaller chunks and only keep a few of them in flight per worker
+STREAM_CHUNK_FRAMES = 15
+STREAM_CHUNKS_PER_WORKER = 2
+
+# --- WORKER STATE ---
+# Built once per process by init_worker() so fonts and static layers are not
+# recreated for every chunk
+font = None
+notes = []
+background = None
+note_sprites = {}
+feedback_sprites = {}
+
+
+def get_wav_duration(filename):
+    with contextlib.closing(wave.open(filename, 'r')) as f:
+        frames = f.getnframes()
+        rate = f.getframerate()
+        return frames / float(rate)
+
+
+def check_notes(chart):
+    # Catch malformed charts up front rather than part way through a render
+    if not isinstance(chart, list):
+        raise ValueError("expected a list of notes")
+    for i, note in enumerate(chart):
+        if not isinstance(note, dict):
+            raise ValueError(f"note {i}: expected an object")
+        time_sec = note.get('time_sec')
+        if isinstance(time_sec, bool) or not isinstance(time_sec, (int, float)):
+            raise ValueError(f"note {i}: 'time_sec' must be a number")
+        lane = note.get('lane')
+        if isinstance(lane, bool) or not isinstance(lane, int) or lane not in range(len(LANE_Y)):
+            raise ValueError(f"note {i}: 'lane' must be one of {list(range(len(LANE_Y)))}")
+        if not isinstance(note.get('type'), str):
+            raise ValueError(f"note {i}: 'type' must be a string")
+
+
+def load_notes(level_path):
+    with open(level_path, "r") as f:
+        chart = json.load(f)
+    check_notes(chart)
+    return sorted(chart, key=lambda note: note['time_sec'])
+
+
+def init_worker(chart):
+    global font, notes, background, note_sprites, feedback_sprites
+
+    pygame.init()
+    font = pygame.font.SysFont("Arial", 24)
+    notes = chart
+
+    # Lanes, labels and hit line never move, so draw them once
+    background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    background.fill(BACKGROUND_COLOR)
+    for i, y in enumerate(LANE_Y):
+        pygame.draw.rect(background, LANE_COLOR, (0, y - LANE_HEIGHT // 2, SCREEN_WIDTH, LANE_HEIGHT))
+        label = font.render(KEY_NAMES[i], True, (180, 180, 180))
+        background.blit(label, label.get_rect(center=(SCREEN_WIDTH // 2 - 100, y)))
+    pygame.draw.line(background, HIT_LINE_COLOR, (SCREEN_WIDTH // 2, 0), (SCREEN_WIDTH // 2, SCREEN_HEIGHT), 2)
+
+    note_sprites = {}
+    feedback_sprites = {}
+    for note in notes:
+        note_type = note['type']
+        if note_type in note_sprites:
+            continue
+        radius = 20 if note_type in COMBO_TYPES else 14
+        sprite = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+        color = NOTE_COLORS.get(note_type, (255, 255, 255))
+        pygame.draw.circle(sprite, color, (radius, radius), radius)
+        label = font.render(note_type, True, (0, 0, 0))
+        sprite.blit(label, label.get_rect(center=(radius, radius)))
+        note_sprites[note_type] = sprite
+
+        feedback = "Perfect Combo" if note_type in COMBO_TYPES else "Perfect"
+        feedback_sprites[note_type] = font.render(feedback, True, (255, 255, 0))
+
+
+def note_score(note):
+    return 200 if note['type'] in COMBO_TYPES else 150
+
+
+def draw_frame(surface, elapsed_time):
+    # Autoplay: every note is hit perfectly as it reaches the hit line, so the
+    # frame depends only on elapsed_time and can be rendered in any order
+    surface.blit(background, (0, 0))
+
+    # Notes still on screen: from the hit line to the right edge (plus margin)
+    max_time = elapsed_time + (SCREEN_WIDTH // 2 + 50) / NOTE_SPEED
+    score = 0
+    combo = 0
+    feedback_messages = []
+    for note in notes:
+        note_time = note['time_sec']
+        if note_time <= elapsed_time:
+            score += note_score(note)
+            combo += 1
+            if elapsed_time - note_time < FEEDBACK_SECONDS:
+                feedback_messages.append(note)
+            continue
+        if note_time > max_time:
+            break
+
+        x = SCREEN_WIDTH // 2 + (note_time - elapsed_time) * NOTE_SPEED
+        sprite = note_sprites[note['type']]
+        surface.blit(sprite, sprite.get_rect(center=(int(x), LANE_Y[note['lane']])))
+
+    # Draw feedback messages on top of the notes, as main.py does
+    for note in feedback_messages:
+        text = feedback_sprites[note['type']]
+        surface.blit(text, text.get_rect(center=(SCREEN_WIDTH // 2 + 80, LANE_Y[note['lane']])))
+
+    # Text info
+    surface.blit(font.render(f"Time: {elapsed_time:.2f}s", True, TEXT_COLOR), (10, 40))
+    surface.blit(font.render(f"Score: {score}", True, TEXT_COLOR), (10, 70))
+    surface.blit(font.render(f"Combo: {combo}", True, TEXT_COLOR), (10, 100))
+
+
+def render_chunk(job):
+    start, stop, fps, out_format, out_path = job
+    surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    frame_size = SCREEN_WIDTH * SCREEN_HEIGHT * 3
+
+    if out_path == "-":
+        # Streaming: hand the frames back to the parent, which writes them in order
+        frames = []
+        for frame in range(start, stop):
+            draw_frame(surface, frame / fps)
+            frames.append(pygame.image.tobytes(surface, "RGB"))
+        return b"".join(frames)
+    elif out_format == "raw":
+        # Every frame has a fixed size, so each chunk writes straight to its
+        # own slice of the preallocated output file
+        with open(out_path, "r+b") as f:
+            f.seek(start * frame_size)
+            for frame in range(start, stop):
+                draw_frame(surface, frame / fps)
+                f.write(pygame.image.tobytes(surface, "RGB"))
+    else:
+        for frame in range(start, stop):
+            draw_frame(surface, frame / fps)
+            path = os.path.join(out_path, f"frame_{frame:06d}.png")
+            if Image is not None:
+                image = Image.frombytes("RGB", surface.get_size(), pygame.image.tobytes(surface, "RGB"))
+                image.save(path, compress_level=1)
+            else:
+                pygame.image.save(surface, path)
+
+    return stop - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a chart to a video frame sequence offline.")
+    parser.add_argument("--level", default="level.json", help="chart to render (default: level.json)")
+    parser.add_argument("--music", default=os.path.join("assets", "beat.wav"),
+                        help="song used to determine the clip length (default: assets/beat.wav)")
+    parser.add_argument("--duration", type=float,
+                        help="clip length in seconds; overrides --music")
+    parser.add_argument("--fps", type=int, default=FPS, help=f"frames per second (default: {FPS})")
+    parser.add_argument("--format", choices=["png", "raw"], default="png",
+                        help="PNG sequence in a directory, or raw RGB24 frames; raw is much faster "
+                             "since PNG encoding dominates the render time (default: png)")
+    parser.add_argument("--out", default="frames",
+                        help="output directory (png), or file or - for stdout (raw)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="number of render processes (default: CPU count)")
+    args = parser.parse_args()
+    if args.fps < 1:
+        parser.error("--fps must be at least 1")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.duration is not None and args.duration < 0:
+        parser.error("--duration must not be negative")
+    if args.out == "-" and args.format != "raw":
+        parser.error("--out - requires --format raw")
+
+    # Load and check the chart once here and hand it to the workers: a worker
+    # failing in init_worker() would be respawned by the pool forever
+    try:
+        chart = load_notes(args.level)
+    except (OSError, ValueError) as e:
+        parser.error(f"cannot load level {args.level}: {e}")
+
+    if args.duration is not None:
+        duration = args.duration
+    elif os.path.exists(args.music):
+        try:
+            duration = get_wav_duration(args.music)
+        except (wave.Error, EOFError) as e:
+            reason = str(e) or "file is truncated"
+            parser.error(f"cannot read {args.music} as PCM WAV ({reason}); pass --duration instead")
+    else:
+        # No song to measure: stop shortly after the last note has been hit
+        duration = (chart[-1]['time_sec'] if chart else 0) + FEEDBACK_SECONDS + 1
+    total_frames = int(duration * args.fps) + 1
+
+    if args.out == "-":
+        pass
+    elif args.format == "raw":
+        with open(args.out, "wb") as f:
+            f.truncate(total_frames * SCREEN_WIDTH * SCREEN_HEIGHT * 3)
+    else:
+        os.makedirs(args.out, exist_ok=True)
+        # Frames left over from an earlier, longer render would otherwise end
+        # up at the tail of the new clip
+        for stale in glob.glob(os.path.join(args.out, "frame_*.png")):
+            os.remove(stale)
+
+    chunk_frames = STREAM_CHUNK_FRAMES if args.out == "-" else CHUNK_FRAMES
+    jobs = [
+        (start, min(start + chunk_frames, total_frames), args.fps, args.format, args.out)
+        for start in range(0, total_frames, chunk_frames)
+    ]
+
+    # Progress goes to stderr so stdout stays free for streamed frames
+    print(f"Rendering {total_frames} frames ({duration:.2f}s at {args.fps} FPS) "
+          f"with {args.workers} worker(s)...", file=sys.stderr)
+    started = time.perf_counter()
+    done = 0
+    with multiprocessing.Pool(args.workers, initializer=init_worker, initargs=(chart,)) as pool:
+        if args.out == "-":
+            # Write chunks in timeline order while a bounded number of later
+            # chunks render, so a slow consumer cannot make results pile up
+            pending = collections.deque()
+            jobs = iter(jobs)
+            for job in jobs:
+                pending.append(pool.apply_async(render_chunk, (job,)))
+                if len(pending) >= args.workers * STREAM_CHUNKS_PER_WORKER:
+                    break
+            try:
+                while pending:
+                    data = pending.popleft().get()
+                    sys.stdout.buffer.write(data)
+                    job = next(jobs, None)
+                    if job is not None:
+                        pending.append(pool.apply_async(render_chunk, (job,)))
+                    done += len(data) // (SCREEN_WIDTH * SCREEN_HEIGHT * 3)
+                    print(f"\r{done}/{total_frames} frames", end="", flush=True, file=sys.stderr)
+                sys.stdout.buffer.flush()
+            except BrokenPipeError:
+                # The reader went away; point stdout at devnull so the flush
+                # at interpreter exit does not raise again
+                os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+                print("\nOutput pipe closed, stopping render", file=sys.stderr)
+                return 1
+        else:
+            for count in pool.imap_unordered(render_chunk, jobs):
+                done += count
+                print(f"\r{done}/{total_frames} frames", end="", flush=True, file=sys.stderr)
+        pool.close()
+        pool.join()
+    elapsed = time.perf_counter() - started
+    speed = f"{duration / elapsed:.1f}x" if elapsed > 0 else "instant"
+    print(f"\nDone in {elapsed:.1f}s ({speed} real time) -> {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    sys.exit(main())